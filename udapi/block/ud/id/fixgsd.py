@@ -3,9 +3,44 @@ from udapi.core.block import Block
 import logging
 import re
 
+# A single match against the form tells which of the form-based fixes apply.
+# The ke-...-an circumfix is tested in a lookahead because some ordinal
+# numerals ('kedelapan', 'kesembilan') have it, too; m.lastgroup then names
+# the numeral group while m['keaan'] is still set.
+# The pattern is case-sensitive; it must be matched against the lowercased form.
+RE_FORM_TRIGGER = re.compile(
+    r'^(?:(?=(?P<keaan>ke.+an$)))?'
+    r'(?:(?P<pertama>pertama(?:nya)?$)'
+    r'|(?P<ordinal>(?:kedua|ketiga|keempat|kelima|keenam|ketujuh|kedelapan|kesembilan|ke-?\d+)(?:nya)?$)'
+    r'|(?P<semua>semua$))?')
+ORD_DEPRELS = {'det', 'nummod', 'nmod'}
+CARD_DEPRELS = {'det', 'amod', 'nmod'}
+RE_DIGITS = re.compile(r'^\d+$')
+NOMINAL_DEPREL_PREFIXES = ('case', 'mark', 'det', 'nummod', 'nmod')
+RE_VOWEL_ALTERNATION = re.compile(r'^(.)o(.)a(.)-\1a\2i\3$')
+PREFIX_WORDS = {'non', 'sub', 'anti', 'multi', 'kontra'}
+HYPHENS = {'-', '–', '--'}
+RE_UNEXPECTED_XPOS = re.compile(r'_[A-Z][-A-Z][-A-Z]$')
+RE_STEM_POS = re.compile(r'<[a-z]+>')
+VERB_SUFFIXES = {'kan', 'i', 'an', 'an_NSD'}
+VERB_PREFIXES = {'meN', 'di', 'ber', 'peN', 'ke', 'ter', 'se', 'per'}
+RE_VERB_STEM_POS = re.compile(r'<[a-z]+>(_.*)?$')
+NOUN_PREFIXES = {'peN', 'per', 'ke', 'ber'}
+
 class FixGSD(Block):
+    """Fix annotation of UD Indonesian-GSD.
+
+    When tokens are merged, the sentence text is recomputed at the end of process_tree().
+    If you call process_node() directly (e.g. `doc.apply_on_nodes(block.process_node)`),
+    call `block.after_process_document(doc)` afterwards to recompute it.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        # Trees whose sentence text must be recomputed because some tokens were merged.
+        self._dirty_roots = set()
 
-    def fix_upos_based_on_morphind(self, node):
+    def fix_upos_based_on_morphind(self, node, m=None):
         """
         Example from data: ("kesamaan"), the correct UPOS is NOUN, as
         suggested by MorphInd.
@@ -14,34 +49,46 @@ class FixGSD(Block):
         I found so many incorrect UPOS in GSD, especially when NOUNs become
         VERBs and VERBs become NOUNs.
         I suggest adding Voice=Pass when the script decides ke-xxx-an as VERB.
+        The optional `m` is the match of RE_FORM_TRIGGER against the lowercased
+        form, if the caller has it already.
         """
-        if node.upos == 'VERB' and node.xpos == 'NSD' and re.match(r'^ke.+an$', node.form, re.IGNORECASE):
+        if node.upos == 'VERB' and node.xpos == 'NSD':
+            if m is None:
+                m = RE_FORM_TRIGGER.match(node.form.lower())
+            if not m['keaan']:
+                return
             node.upos = 'NOUN'
-            if node.udeprel == 'acl':
+            udeprel = node.udeprel
+            if udeprel == 'acl':
                 node.deprel = 'nmod'
-            elif node.udeprel == 'advcl':
+            elif udeprel == 'advcl':
                 node.deprel = 'obl'
 
-    def fix_semua(self, node):
+    def fix_semua(self, node, m=None):
         """
         Indonesian "semua" means "everything, all".
         Originally it was DET, PRON, or ADV.
         Ika: I usually only labeled "semua" as DET only if it's followed by a
         NOUN/PROPN. If it's followed by DET (including '-nya' as DET) or it's
         not followed by any NOUN/DET, I labeled them as PRON.
+        The optional `m` is the match of RE_FORM_TRIGGER against the lowercased
+        form, if the caller has it already.
         """
-        if node.form.lower() == 'semua':
-            if re.match(r'^(NOUN|PROPN)$', node.parent.upos) and node.parent.ord > node.ord:
-                node.upos = 'DET'
-                if node.udeprel == 'nmod' or node.udeprel == 'advmod':
-                    node.deprel = 'det'
-            else:
-                node.upos = 'PRON'
-                if node.udeprel == 'det' or node.udeprel == 'advmod':
-                    node.deprel = 'nmod'
-            node.feats['PronType'] = 'Tot'
+        if m is None:
+            m = RE_FORM_TRIGGER.match(node.form.lower())
+        if m.lastgroup != 'semua':
+            return
+        if node.parent.upos in ('NOUN', 'PROPN') and node.parent.ord > node.ord:
+            node.upos = 'DET'
+            if node.udeprel == 'nmod' or node.udeprel == 'advmod':
+                node.deprel = 'det'
+        else:
+            node.upos = 'PRON'
+            if node.udeprel == 'det' or node.udeprel == 'advmod':
+                node.deprel = 'nmod'
+        node.feats['PronType'] = 'Tot'
 
-    def fix_ordinal_numerals(self, node):
+    def fix_ordinal_numerals(self, node, m=None):
         """
         Ordinal numerals should be ADJ NumType=Ord in UD. They have many different
         UPOS tags in Indonesian GSD. This method harmonizes them.
@@ -62,24 +109,29 @@ class FixGSD(Block):
         an ordinal. An exception is when the modified noun is 'kali' = 'time'.
         Then the numeral is ordinal regardless where it occurs, and together
         with 'kali' it functions as an adverbial ordinal ('for the second time').
+
+        The optional `m` is the match of RE_FORM_TRIGGER against the lowercased
+        form, if the caller has it already.
         """
+        if m is None:
+            m = RE_FORM_TRIGGER.match(node.form.lower())
         # We could also check the XPOS, which is derived from MorphInd: re.match(r'^CO-', node.xpos)
-        if re.match(r'^pertama(nya)?$', node.form, re.IGNORECASE):
+        if m.lastgroup == 'pertama':
             node.upos = 'ADJ'
             node.feats['NumType'] = 'Ord'
-            if re.match(r'^(det|nummod|nmod)$', node.udeprel):
+            if node.udeprel in ORD_DEPRELS:
                 node.deprel = 'amod'
-        elif re.match(r'^(kedua|ketiga|keempat|kelima|keenam|ketujuh|kedelapan|kesembilan|ke-?\d+)(nya)?$', node.form, re.IGNORECASE):
+        elif m.lastgroup == 'ordinal':
             if node.parent.ord < node.ord or node.parent.lemma == 'kali':
                 node.upos = 'ADJ'
                 node.feats['NumType'] = 'Ord'
-                if re.match(r'^(det|nummod|nmod)$', node.udeprel):
+                if node.udeprel in ORD_DEPRELS:
                     node.deprel = 'amod'
             else:
                 node.upos = 'NUM'
                 node.feats['NumType'] = 'Card'
                 node.feats['PronType'] = 'Tot'
-                if re.match(r'^(det|amod|nmod)$', node.udeprel):
+                if node.udeprel in CARD_DEPRELS:
                     node.deprel = 'nummod'
 
     def rejoin_ordinal_numerals(self, node):
@@ -93,11 +145,11 @@ class FixGSD(Block):
             if node.next_node:
                 if node.next_node.form == '-':
                     dash = node.next_node
-                    if dash.next_node and re.match(r'^\d+$', dash.next_node.form):
+                    if dash.next_node and RE_DIGITS.match(dash.next_node.form):
                         number = dash.next_node
                         node.form = node.form + dash.form + number.form
                         node.lemma = node.lemma + dash.lemma + number.lemma
-                elif re.match(r'^\d+$', node.next_node.form) and (node.parent == node.next_node or node.next_node.parent == node):
+                elif RE_DIGITS.match(node.next_node.form) and (node.parent == node.next_node or node.next_node.parent == node):
                     number = node.next_node
                     node.feats['Typo'] = 'Yes'
                     node.misc['CorrectForm'] = node.form + '-' + number.form
@@ -115,22 +167,18 @@ class FixGSD(Block):
                     if node.parent == number:
                         node.parent = number.parent
                         node.deprel = number.deprel
-                    if re.match(r'(case|mark|det|nummod|nmod)', node.udeprel):
+                    if node.udeprel.startswith(NOMINAL_DEPREL_PREFIXES):
                         node.deprel = 'amod'
                     # Adjust SpaceAfter.
                     node.misc['SpaceAfter'] = 'No' if number.no_space_after else ''
                     # Remove the separate node of the dash and the number.
                     if dash:
-                        if len(dash.children) > 0:
-                            for c in dash.children:
-                                c.parent = node
+                        dash.move_children_to(node)
                         dash.remove()
-                    if len(number.children) > 0:
-                        for c in number.children:
-                            c.parent = node
+                    number.move_children_to(node)
                     number.remove()
                     # There may have been spaces around the dash, which are now gone. Recompute the sentence text.
-                    node.root.text = node.root.compute_text()
+                    self._dirty_roots.add(node.root)
 
     def rejoin_decades(self, node):
         """
@@ -143,11 +191,11 @@ class FixGSD(Block):
             if node.prev_node:
                 if node.prev_node.form == '-':
                     dash = node.prev_node
-                    if dash.prev_node and re.match(r'^\d+$', dash.prev_node.form):
+                    if dash.prev_node and RE_DIGITS.match(dash.prev_node.form):
                         number = dash.prev_node
                         node.form = number.form + dash.form + node.form
                         node.lemma = number.lemma + dash.lemma + node.lemma
-                elif re.match(r'^\d+$', node.prev_node.form) and (node.parent == node.prev_node or node.prev_node.parent == node):
+                elif RE_DIGITS.match(node.prev_node.form) and (node.parent == node.prev_node or node.prev_node.parent == node):
                     number = node.prev_node
                     node.feats['Typo'] = 'Yes'
                     node.misc['CorrectForm'] = number.form + '-' + node.form
@@ -166,22 +214,18 @@ class FixGSD(Block):
                     if node.parent == number:
                         node.parent = number.parent
                         node.deprel = number.deprel
-                    if re.match(r'(case|mark|det|nummod|nmod)', node.udeprel):
+                    if node.udeprel.startswith(NOMINAL_DEPREL_PREFIXES):
                         node.deprel = 'nmod'
                     # No need to adjust SpaceAfter, as the 'an' node was the last one in the complex.
                     #node.misc['SpaceAfter'] = 'No' if number.no_space_after else ''
                     # Remove the separate node of the dash and the number.
                     if dash:
-                        if len(dash.children) > 0:
-                            for c in dash.children:
-                                c.parent = node
+                        dash.move_children_to(node)
                         dash.remove()
-                    if len(number.children) > 0:
-                        for c in number.children:
-                            c.parent = node
+                    number.move_children_to(node)
                     number.remove()
                     # There may have been spaces around the dash, which are now gone. Recompute the sentence text.
-                    node.root.text = node.root.compute_text()
+                    self._dirty_roots.add(node.root)
 
     def merge_reduplication(self, node):
         """
@@ -196,34 +240,34 @@ class FixGSD(Block):
         # We assume that the previous token is a hyphen and the token before it is the parent.
         first = node.parent
         root = node.root
+        first_lc = first.form.lower()
+        node_lc = node.form.lower()
         # Example of identical reduplication: negara-negara = countries
         # Example of reduplication with -an: kopi-kopian = various coffee trees
         # Example of reduplication with vowel substitution: bolak-balik = alternating
         # Example of reduplication with di-: disebut-sebut = mentioned (the verb sebut is reduplicated, then passivized)
         # Example of reduplication with se-: sehari-hari = daily (hari = day)
         # The last pattern is not reduplication but we handle it here because the procedure is very similar: non-/sub-/anti- + a word.
-        if first.ord == node.ord-2 and (first.form.lower() == node.form.lower() or first.form.lower() + 'an' == node.form.lower() or re.match(r'^(.)o(.)a(.)-\1a\2i\3$', first.form.lower() + '-' + node.form.lower()) or first.form.lower() == 'di' + node.form.lower() or first.form.lower() == 'se' + node.form.lower() or re.match(r'^(non|sub|anti|multi|kontra)$', first.form.lower())):
+        if first.ord == node.ord-2 and (first_lc == node_lc or first_lc + 'an' == node_lc or RE_VOWEL_ALTERNATION.match(first_lc + '-' + node_lc) or first_lc == 'di' + node_lc or first_lc == 'se' + node_lc or first_lc in PREFIX_WORDS):
             hyph = node.prev_node
-            if hyph.is_descendant_of(first) and re.match(r'^(-|–|--)$', hyph.form):
+            if hyph.is_descendant_of(first) and hyph.form in HYPHENS:
                 # This is specific to the reduplicated plurals. The rest will be done for any reduplications.
                 # Note that not all reduplicated plurals had compound:plur. So we will look at whether they are NOUN.
                 ###!!! Also, reduplicated plural nouns always have exact copies on both sides of the hyphen.
                 ###!!! Some other reduplications have slight modifications on one or the other side.
-                if node.upos == 'NOUN' and first.form.lower() == node.form.lower():
+                if node.upos == 'NOUN' and first_lc == node_lc:
                     first.feats['Number'] = 'Plur'
                 # For the non-/sub-/anti- prefix we want to take the morphology from the second word.
-                if re.match(r'^(non|sub|anti|multi|kontra)$', first.form.lower()):
+                if first_lc in PREFIX_WORDS:
                     first.lemma = first.lemma + '-' + node.lemma
                     first.upos = node.upos
                     first.xpos = node.xpos
                     first.feats = node.feats
-                    first.misc['MorphInd'] = re.sub(r'\$\+\^', '+', first.misc['MorphInd'] + '+' + node.misc['MorphInd'])
+                    first.misc['MorphInd'] = (first.misc['MorphInd'] + '+' + node.misc['MorphInd']).replace('$+^', '+')
                 # Neither the hyphen nor the current node should have children.
                 # If they do, re-attach the children to the first node.
-                for c in hyph.children:
-                    c.parent = first
-                for c in node.children:
-                    c.parent = first
+                hyph.move_children_to(first)
+                node.move_children_to(first)
                 # Merge the three nodes.
                 # It is possible that the last token of the original annotation
                 # is included in a multi-word token. Then we must extend the
@@ -254,22 +298,20 @@ class FixGSD(Block):
                 # We cannot be sure whether the original annotation correctly said that there are no spaces around the hyphen.
                 # If it did not, then we have a mismatch with the sentence text, which we must fix.
                 # The following will also fix cases where there was an n-dash ('–') instead of a hyphen ('-').
-                root.text = root.compute_text()
+                self._dirty_roots.add(root)
         # In some cases the non-/sub-/anti- prefix is annotated as the head of the phrase and the above pattern does not catch it.
-        elif first.ord == node.ord+2 and re.match(r'^(non|sub|anti|multi|kontra)$', node.form.lower()):
+        elif first.ord == node.ord+2 and node_lc in PREFIX_WORDS:
             prefix = node
             stem = first # here it is not the first part at all
             hyph = stem.prev_node
-            if hyph.is_descendant_of(first) and re.match(r'^(-|–|--)$', hyph.form):
+            if hyph.is_descendant_of(first) and hyph.form in HYPHENS:
                 # For the non-/sub-/anti- prefix we want to take the morphology from the second word.
                 stem.lemma = prefix.lemma + '-' + stem.lemma
-                stem.misc['MorphInd'] = re.sub(r'\$\+\^', '+', prefix.misc['MorphInd'] + '+' + stem.misc['MorphInd'])
+                stem.misc['MorphInd'] = (prefix.misc['MorphInd'] + '+' + stem.misc['MorphInd']).replace('$+^', '+')
                 # Neither the hyphen nor the prefix should have children.
                 # If they do, re-attach the children to the stem.
-                for c in hyph.children:
-                    c.parent = stem
-                for c in prefix.children:
-                    c.parent = stem
+                hyph.move_children_to(stem)
+                prefix.move_children_to(stem)
                 # Merge the three nodes.
                 # It is possible that the last token of the original annotation
                 # is included in a multi-word token. Then we must extend the
@@ -296,18 +338,19 @@ class FixGSD(Block):
                 # We cannot be sure whether the original annotation correctly said that there are no spaces around the hyphen.
                 # If it did not, then we have a mismatch with the sentence text, which we must fix.
                 # The following will also fix cases where there was an n-dash ('–') instead of a hyphen ('-').
-                root.text = root.compute_text()
+                self._dirty_roots.add(root)
 
     def fix_plural_propn(self, node):
         """
         It is unlikely that a proper noun will have a plural form in Indonesian.
         All examples observed in GSD should actually be tagged as common nouns.
         """
-        if node.upos == 'PROPN' and node.feats['Number'] == 'Plur':
-            node.upos = 'NOUN'
-            node.lemma = node.lemma.lower()
         if node.upos == 'PROPN':
-            node.feats['Number'] = ''
+            if node.feats['Number'] == 'Plur':
+                node.upos = 'NOUN'
+                node.lemma = node.lemma.lower()
+            else:
+                node.feats['Number'] = ''
 
     def fix_satu_satunya(self, node):
         """
@@ -324,7 +367,7 @@ class FixGSD(Block):
                 dash = satu1.prev_node
                 satu0.misc['SpaceAfter'] = 'No'
                 dash.misc['SpaceAfter'] = 'No'
-                root.text = root.compute_text()
+                self._dirty_roots.add(root)
             satu1.deprel = 'compound:redup'
             nya.parent = satu0
         # We actually cannot leave the 'compound:redup' here because it is not used in Indonesian.
@@ -347,7 +390,7 @@ class FixGSD(Block):
                             mwt.remove()
                             mwt = root.create_multiword_token([satu0, nya], satu0.form + nya.form, mwtmisc)
                             satu0.misc['SpaceAfter'] = ''
-                        root.text = root.compute_text()
+                        self._dirty_roots.add(root)
         if node.multiword_token and node.no_space_after:
             node.misc['SpaceAfter'] = ''
 
@@ -356,24 +399,28 @@ class FixGSD(Block):
         # The analysis has been interpreted wrongly for some verbs, so we need
         # to re-interpret it and extract the correct lemma.
         morphind = node.misc['MorphInd']
-        if node.upos == 'VERB':
+        upos = node.upos
+        if upos == 'VERB':
             if morphind:
                 # Remove the start and end tags from morphind.
-                morphind = re.sub(r"^\^", "", morphind)
-                morphind = re.sub(r"\$$", "", morphind)
+                if morphind.startswith('^'):
+                    morphind = morphind[1:]
+                if morphind.endswith('$'):
+                    morphind = morphind[:-1]
                 # Remove the final XPOS tag from morphind.
-                morphind = re.sub(r"_V[SP][AP]$", "", morphind)
+                if morphind.endswith(('_VSA', '_VSP', '_VPA', '_VPP')):
+                    morphind = morphind[:-4]
                 # Split morphind to prefix, stem, and suffix.
-                morphemes = re.split(r"\+", morphind)
+                morphemes = morphind.split('+')
                 # Expected suffixes are -kan, -i, -an, or no suffix at all.
                 # There is also the circumfix ke-...-an which seems to be nominalized adjective:
                 # "sama" = "same, similar"; "kesamaan" = "similarity", lemma is "sama";
                 # but I am not sure what is the reason that these are tagged VERB.
-                if len(morphemes) > 1 and re.match(r"^(kan|i|an(_NSD)?)$", morphemes[-1]):
+                if len(morphemes) > 1 and morphemes[-1] in VERB_SUFFIXES:
                     del morphemes[-1]
                 # Expected prefixes are meN-, di-, ber-, peN-, ke-, ter-, se-, or no prefix at all.
                 # There can be two prefixes in a row, e.g., "ber+ke+", or "ter+peN+".
-                while len(morphemes) > 1 and re.match(r"^(meN|di|ber|peN|ke|ter|se|per)$", morphemes[0]):
+                while len(morphemes) > 1 and morphemes[0] in VERB_PREFIXES:
                     del morphemes[0]
                 # Check that we are left with just one morpheme.
                 if len(morphemes) != 1:
@@ -381,26 +428,29 @@ class FixGSD(Block):
                 else:
                     lemma = morphemes[0]
                     # Remove the stem POS category.
-                    lemma = re.sub(r"<[a-z]+>(_.*)?$", "", lemma)
+                    lemma = RE_VERB_STEM_POS.sub('', lemma)
                     node.lemma = lemma
             else:
                 logging.warning("No MorphInd analysis found for form '%s'" % (node.form))
-        elif node.upos == 'NOUN':
+        elif upos == 'NOUN':
             if morphind:
                 # Remove the start and end tags from morphind.
-                morphind = re.sub(r"^\^", "", morphind)
-                morphind = re.sub(r"\$$", "", morphind)
+                if morphind.startswith('^'):
+                    morphind = morphind[1:]
+                if morphind.endswith('$'):
+                    morphind = morphind[:-1]
                 # Remove the final XPOS tag from morphind.
-                morphind = re.sub(r'_(N[SP]D|VSA)$', '', morphind)
+                if morphind.endswith(('_NSD', '_NPD', '_VSA')):
+                    morphind = morphind[:-4]
                 # Do not proceed if there is an unexpected final XPOS tag.
-                if not re.search(r'_[A-Z][-A-Z][-A-Z]$', morphind):
+                if not RE_UNEXPECTED_XPOS.search(morphind):
                     # Split morphind to prefix, stem, and suffix.
-                    morphemes = re.split(r'\+', morphind)
+                    morphemes = morphind.split('+')
                     # Expected prefixes are peN-, per-, ke-, ber-.
                     # Expected suffix is -an.
-                    if len(morphemes) > 1 and re.match(r'^an$', morphemes[-1]):
+                    if len(morphemes) > 1 and morphemes[-1] == 'an':
                         del morphemes[-1]
-                    if len(morphemes) > 1 and re.match(r'^(peN|per|ke|ber)$', morphemes[0]):
+                    if len(morphemes) > 1 and morphemes[0] in NOUN_PREFIXES:
                         del morphemes[0]
                     # Check that we are left with just one morpheme.
                     if len(morphemes) != 1:
@@ -408,21 +458,24 @@ class FixGSD(Block):
                     else:
                         lemma = morphemes[0]
                         # Remove the stem POS category.
-                        lemma = re.sub(r'<[a-z]+>', '', lemma)
+                        lemma = RE_STEM_POS.sub('', lemma)
                         node.lemma = lemma
-        elif node.upos == 'ADJ':
+        elif upos == 'ADJ':
             if morphind:
                 # Remove the start and end tags from morphind.
-                morphind = re.sub(r"^\^", "", morphind)
-                morphind = re.sub(r"\$$", "", morphind)
+                if morphind.startswith('^'):
+                    morphind = morphind[1:]
+                if morphind.endswith('$'):
+                    morphind = morphind[:-1]
                 # Remove the final XPOS tag from morphind.
-                morphind = re.sub(r'_ASS$', '', morphind)
+                if morphind.endswith('_ASS'):
+                    morphind = morphind[:-4]
                 # Do not proceed if there is an unexpected final XPOS tag.
-                if not re.search(r'_[A-Z][-A-Z][-A-Z]$', morphind):
+                if not RE_UNEXPECTED_XPOS.search(morphind):
                     # Split morphind to prefix, stem, and suffix.
-                    morphemes = re.split(r'\+', morphind)
+                    morphemes = morphind.split('+')
                     # Expected prefix is ter-.
-                    if len(morphemes) > 1 and re.match(r'^ter$', morphemes[0]):
+                    if len(morphemes) > 1 and morphemes[0] == 'ter':
                         del morphemes[0]
                     # Check that we are left with just one morpheme.
                     if len(morphemes) != 1:
@@ -430,17 +483,44 @@ class FixGSD(Block):
                     else:
                         lemma = morphemes[0]
                         # Remove the stem POS category.
-                        lemma = re.sub(r'<[a-z]+>', '', lemma)
+                        lemma = RE_STEM_POS.sub('', lemma)
                         node.lemma = lemma
             else:
                 logging.warning("No MorphInd analysis found for form '%s'" % (node.form))
 
+    def process_tree(self, tree):
+        for node in tree.descendants:
+            self.process_node(node)
+        # A sentence may contain several merged tokens, so compute its text just once at the end.
+        if tree in self._dirty_roots:
+            self._dirty_roots.discard(tree)
+            self._recompute_text(tree)
+
+    def after_process_document(self, document):
+        """Recompute the text of sentences which were not processed via process_tree()."""
+        for root in self._dirty_roots:
+            self._recompute_text(root)
+        self._dirty_roots.clear()
+
+    def _recompute_text(self, root):
+        """Set the sentence text from the (merged) tokens."""
+        # Merging often only replaces one hyphen with another and the text stays the same.
+        new_text = root.compute_text()
+        if new_text != root.text:
+            root.text = new_text
+
     def process_node(self, node):
         self.fix_plural_propn(node)
-        self.fix_upos_based_on_morphind(node)
-        self.fix_semua(node)
+        form = node.form
+        # Match the form once and share the result with the form-based fixes.
+        m = RE_FORM_TRIGGER.match(form.lower())
+        self.fix_upos_based_on_morphind(node, m)
+        self.fix_semua(node, m)
         self.rejoin_ordinal_numerals(node)
-        self.fix_ordinal_numerals(node)
+        # Rejoining changes e.g. 'ke' to 'ke-18', which is an ordinal numeral.
+        if node.form != form:
+            m = RE_FORM_TRIGGER.match(node.form.lower())
+        self.fix_ordinal_numerals(node, m)
         self.rejoin_decades(node)
         self.merge_reduplication(node)
         self.fix_satu_satunya(node)
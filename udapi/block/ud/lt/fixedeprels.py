@@ -3,55 +3,65 @@ from udapi.core.block import Block
 import logging
 import re
 
-class FixEdeprels(Block):
+# Sometimes there are multiple layers of case marking and only the outermost
+# layer should be reflected in the relation. For example, the semblative 'jako'
+# is used with the same case (preposition + morphology) as the nominal that
+# is being compared ('jako_v:loc' etc.) We do not want to multiply the relations
+# by all the inner cases.
+# The set in the value contains exceptions that should be left intact.
+OUTERMOST = {
+    'kaip': frozenset(),
+    'lyg':  frozenset(),
+    'negu': frozenset(),
+    'nei':  frozenset(),
+    'nes':  frozenset()
+}
+# Matches every outermost expression at once. Longer keys are tried first.
+RE_OUTERMOST = re.compile(r'^(obl(?::arg)?|nmod|advcl|acl(?::relcl)?):('
+                          + '|'.join(map(re.escape, sorted(OUTERMOST, key=len, reverse=True)))
+                          + r')([_:].+)?$')
 
-    # Sometimes there are multiple layers of case marking and only the outermost
-    # layer should be reflected in the relation. For example, the semblative 'jako'
-    # is used with the same case (preposition + morphology) as the nominal that
-    # is being compared ('jako_v:loc' etc.) We do not want to multiply the relations
-    # by all the inner cases.
-    # The list in the value contains exceptions that should be left intact.
-    outermost = {
-        'kaip': [],
-        'lyg':  [],
-        'negu': [],
-        'nei':  [],
-        'nes':  []
-    }
+# Secondary prepositions sometimes have the lemma of the original part of
+# speech. We want the grammaticalized form instead. List even those that
+# will have the same lexical form, as we also want to check the morphological
+# case. And include all other prepositions that have unambiguous morphological
+# case, even if they are not secondary.
+UNAMBIGUOUS = {
+    'apie':             'apie:acc', # about (topic)
+    'dėl':              'dėl:gen', # because of
+    'iki':              'iki:gen', # until
+    'iš':               'iš:gen', # from, out of
+    'į':                'į:acc', # to, into, in
+    'jei':              'jei', # remove morphological case # if
+    'jeigu':            'jeigu', # remove morphological case # if
+    'jog':              'jog', # remove morphological case # because
+    'kadangi':          'kadangi', # remove morphological case # since, because
+    'kai':              'kai', # remove morphological case # when
+    'kaip':             'kaip', # remove morphological case # as, than
+    'lyg':              'lyg', # remove morphological case # like
+    'negu':             'negu', # remove morphological case # than
+    'nei':              'nei', # remove morphological case # more than
+    'nes':              'nes', # remove morphological case # because
+    'nors':             'nors', # remove morphological case # though, although, when, if
+    'nuo':              'nuo:gen', # from
+    'pagal':            'pagal:acc', # according to, under, by
+    'pagal_dėl':        'pagal:acc',
+    'per':              'per:acc', # through, over (přes)
+    'prie':             'prie:gen', # to, at, near, under
+    'prieš':            'prieš:acc', # against
+    'su':               'su:ins', # with
+    'tarp':             'tarp:gen', # between
+    'tarsi':            'tarsi', # remove morphological case # as if
+    'virš':             'virš:gen' # above
+}
+# The keys contain no colon, so the candidate key is whatever stands between
+# the relation and the optional case; a dictionary lookup then decides.
+RE_UNAMBIGUOUS = re.compile(r'^(obl(?::arg)?|nmod|advcl|acl(?::relcl)?):([^:]+)(?::(?:nom|gen|dat|acc|voc|loc|ins))?$')
+# Prepositions that occur with more than one morphological case, and the
+# cases (if any) that cannot be correct with them.
+RE_MULTICASE = re.compile(r'^(obl(?::arg)?|nmod):(po|už)(?::(?:nom|voc))?$')
 
-    # Secondary prepositions sometimes have the lemma of the original part of
-    # speech. We want the grammaticalized form instead. List even those that
-    # will have the same lexical form, as we also want to check the morphological
-    # case. And include all other prepositions that have unambiguous morphological
-    # case, even if they are not secondary.
-    unambiguous = {
-        'apie':             'apie:acc', # about (topic)
-        'dėl':              'dėl:gen', # because of
-        'iki':              'iki:gen', # until
-        'iš':               'iš:gen', # from, out of
-        'į':                'į:acc', # to, into, in
-        'jei':              'jei', # remove morphological case # if
-        'jeigu':            'jeigu', # remove morphological case # if
-        'jog':              'jog', # remove morphological case # because
-        'kadangi':          'kadangi', # remove morphological case # since, because
-        'kai':              'kai', # remove morphological case # when
-        'kaip':             'kaip', # remove morphological case # as, than
-        'lyg':              'lyg', # remove morphological case # like
-        'negu':             'negu', # remove morphological case # than
-        'nei':              'nei', # remove morphological case # more than
-        'nes':              'nes', # remove morphological case # because
-        'nors':             'nors', # remove morphological case # though, although, when, if
-        'nuo':              'nuo:gen', # from
-        'pagal':            'pagal:acc', # according to, under, by
-        'pagal_dėl':        'pagal:acc',
-        'per':              'per:acc', # through, over (přes)
-        'prie':             'prie:gen', # to, at, near, under
-        'prieš':            'prieš:acc', # against
-        'su':               'su:ins', # with
-        'tarp':             'tarp:gen', # between
-        'tarsi':            'tarsi', # remove morphological case # as if
-        'virš':             'virš:gen' # above
-    }
+class FixEdeprels(Block):
 
     def copy_case_from_adposition(self, node, adposition):
         """
@@ -72,11 +82,11 @@ class FixEdeprels(Block):
         trees do not match the whitelist. For example, the noun is an
         abbreviation and its morphological case is unknown.
         """
+        # Node.deps deserializes the DEPS column only once and then returns the same
+        # list, so the edeps can be modified in place (node.raw_deps serializes them).
         for edep in node.deps:
-            m = re.match(r'^(obl(?::arg)?|nmod|advcl|acl(?::relcl)?):', edep['deprel'])
-            if m:
-                bdeprel = m.group(1)
-                solved = False
+            # Only these relations are case-enhanced. A plain prefix test skips the others quickly.
+            if edep['deprel'].startswith(('obl:', 'nmod:', 'advcl:', 'acl:')):
                 # Issues caused by errors in the original annotation must be fixed early.
                 # Especially if acl|advcl occurs with a preposition that unambiguously
                 # receives a morphological case in the subsequent steps, and then gets
@@ -86,43 +96,39 @@ class FixEdeprels(Block):
                 # If one of the following expressions occurs followed by another preposition
                 # or by morphological case, remove the additional case marking. For example,
                 # 'jako_v' becomes just 'jako'.
-                for x in self.outermost:
-                    exceptions = self.outermost[x]
-                    m = re.match(r'^(obl(?::arg)?|nmod|advcl|acl(?::relcl)?):'+x+r'([_:].+)?$', edep['deprel'])
-                    if m and m.group(2) and not x+m.group(2) in exceptions:
-                        edep['deprel'] = m.group(1)+':'+x
-                        solved = True
-                        break
-                if solved:
-                    continue
-                for x in self.unambiguous:
-                    # All secondary prepositions have only one fixed morphological case
-                    # they appear with, so we can replace whatever case we encounter with the correct one.
-                    m = re.match(r'^(obl(?::arg)?|nmod|advcl|acl(?::relcl)?):'+x+r'(?::(?:nom|gen|dat|acc|voc|loc|ins))?$', edep['deprel'])
-                    if m:
-                        edep['deprel'] = m.group(1)+':'+self.unambiguous[x]
-                        solved = True
-                        break
-                if solved:
-                    continue
+                m = RE_OUTERMOST.match(edep['deprel'])
+                if m:
+                    relation, prep, inner = m.group(1, 2, 3)
+                    if inner and prep+inner not in OUTERMOST[prep]:
+                        edep['deprel'] = relation+':'+prep
+                        continue
+                # All secondary prepositions have only one fixed morphological case
+                # they appear with, so we can replace whatever case we encounter with the correct one.
+                m = RE_UNAMBIGUOUS.match(edep['deprel'])
+                if m:
+                    relation, prep = m.group(1, 2)
+                    if prep in UNAMBIGUOUS:
+                        edep['deprel'] = relation+':'+UNAMBIGUOUS[prep]
+                        continue
                 # The following prepositions have more than one morphological case
                 # available. Thanks to the Case feature on prepositions, we can
                 # identify the correct one. Exclude 'nom' and 'voc', which cannot
                 # be correct.
-                m = re.match(r'^(obl(?::arg)?|nmod):(po|už)(?::(?:nom|voc))?$', edep['deprel'])
+                m = RE_MULTICASE.match(edep['deprel'])
                 if m:
-                    adpcase = self.copy_case_from_adposition(node, m.group(2))
-                    if adpcase and not re.search(r':(nom|voc)$', adpcase):
-                        edep['deprel'] = m.group(1)+':'+adpcase
+                    relation, prep = m.group(1, 2)
+                    adpcase = self.copy_case_from_adposition(node, prep)
+                    if adpcase and not adpcase.endswith((':nom', ':voc')):
+                        edep['deprel'] = relation+':'+adpcase
                         continue
                     # The remaining instance of 'po' should be ':acc'.
-                    elif m.group(2) == 'po':
-                        edep['deprel'] = m.group(1)+':po:acc'
+                    elif prep == 'po':
+                        edep['deprel'] = relation+':po:acc'
                         continue
                     # The remaining 'už' are ':acc' (they are second conjuncts
                     # in coordinated oblique modifiers).
-                    elif m.group(2) == 'už':
-                        edep['deprel'] = m.group(1)+':už:acc'
+                    elif prep == 'už':
+                        edep['deprel'] = relation+':už:acc'
                         continue
 
     def set_basic_and_enhanced(self, node, parent, deprel, edeprel):
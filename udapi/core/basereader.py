@@ -4,6 +4,7 @@ import re
 import logging
 from udapi.core.block import Block
 from udapi.core.files import Files
+from udapi.core.document import Document
 
 # pylint: disable=too-many-instance-attributes
 
@@ -309,10 +310,6 @@ class BaseReader(Block):
 
     def read_documents(self):
         """Load all documents of this reader and return them as a list."""
-        # udapi.core.document imports udapi.block.read.conllu because of doc.load_conllu(filename)
-        # and udapi.block.read.conllu loads this module (udapi.core.basereader),
-        # so we cannot load udapi.core.document at the beginning of this module.
-        from udapi.core.document import Document
         docs = []
         while not self.finished:
             doc = Document()
@@ -58,8 +58,9 @@ class Block(object):
         # but it seems safer to iterate over a copy of the list of nodes.
         # If a user calls parent.create_child().shift_before_node(parent) in process_node,
         # it may end up in endless cycle (because the same node is processed again - Python for cycle remembers the position).
+        process_node = self.process_node
         for node in tree.descendants:
-            self.process_node(node)
+            process_node(node)
 
     @not_overridden
     def process_bundle(self, bundle):
@@ -105,6 +106,8 @@ class Block(object):
                         self.process_coref_mention(mention)
 
         if p_bundle or p_tree or p_node or p_empty_node:
+            # Look up the bound methods just once, not for each node.
+            process_node, process_empty_node = self.process_node, self.process_empty_node
             for bundle_no, bundle in enumerate(document.bundles, 1):
                 logging.debug(f'Block {self.block_name()} processing '
                               f'bundle #{bundle_no} (id={bundle.bundle_id})')
@@ -118,10 +121,10 @@ class Block(object):
                             else:
                                 if p_node:
                                     for node in tree.descendants:
-                                        self.process_node(node)
+                                        process_node(node)
                                 if p_empty_node:
                                     for empty_node in tree.empty_nodes:
-                                        self.process_empty_node(empty_node)
+                                        process_empty_node(empty_node)
 
     @not_overridden
     def process_coref_entity(self, entity):
@@ -1,15 +1,17 @@
 """Document class is a container for UD trees."""
 
 import io
+import itertools
 import contextlib
 import logging
 import udapi.core.coref
 from udapi.core.bundle import Bundle
-from udapi.block.read.conllu import Conllu as ConlluReader
-from udapi.block.write.conllu import Conllu as ConlluWriter
-from udapi.block.read.sentences import Sentences as SentencesReader
 from udapi.block.write.textmodetrees import TextModeTrees
 
+# The readers and writers are imported in the methods which need them.
+# Note that importing this module runs udapi/__init__.py, which loads udapi.block.read.conllu
+# via udapi.core.run, so only udapi.block.write.conllu and udapi.block.read.sentences are deferred.
+
 class Document(object):
     """Document is a container for Universal Dependency trees."""
 
@@ -34,6 +36,7 @@ class Document(object):
             if filename.endswith(".conllu"):
                 self.load_conllu(filename, **kwargs)
             elif filename.endswith(".txt"):
+                from udapi.block.read.sentences import Sentences as SentencesReader
                 reader = SentencesReader(files=[filename], **kwargs)
                 reader.apply_on_document(self)
             else:
@@ -65,19 +68,23 @@ class Document(object):
 
     def load_conllu(self, filename=None, **kwargs):
         """Load a document from a conllu-formatted file."""
+        from udapi.block.read.conllu import Conllu as ConlluReader
         ConlluReader(files=[filename], **kwargs).process_document(self)
 
     def store_conllu(self, filename):
         """Store a document into a conllu-formatted file."""
+        from udapi.block.write.conllu import Conllu as ConlluWriter
         ConlluWriter(files=[filename]).apply_on_document(self)
 
     def from_conllu_string(self, string):
         """Load a document from a conllu-formatted string."""
+        from udapi.block.read.conllu import Conllu as ConlluReader
         reader = ConlluReader(filehandle=io.StringIO(string))
         reader.apply_on_document(self)
 
     def to_conllu_string(self):
         """Return the document as a conllu-formatted string."""
+        from udapi.block.write.conllu import Conllu as ConlluWriter
         fh = io.StringIO()
         with contextlib.redirect_stdout(fh):
             ConlluWriter().apply_on_document(self)
@@ -93,20 +100,24 @@ class Document(object):
     @property
     def nodes(self):
         """An iterator over all nodes (excluding empty nodes) in the document."""
-        for bundle in self:
-            for tree in bundle:
-                # tree.descendants is slightly slower than tree._descendants,
-                # but it seems safer, see the comment in udapi.core.block.Block.process_tree().
-                for node in tree.descendants:
-                    yield node
+        # tree.descendants is slightly slower than tree._descendants,
+        # but it seems safer, see the comment in udapi.core.block.Block.process_tree().
+        # The innermost loop is left to itertools.chain, which avoids one generator frame switch per node.
+        return itertools.chain.from_iterable(tree.descendants for bundle in self for tree in bundle)
 
     @property
     def nodes_and_empty(self):
         """An iterator over all nodes and empty nodes in the document."""
-        for bundle in self:
-            for tree in bundle:
-                for node in tree.descendants_and_empty:
-                    yield node
+        return itertools.chain.from_iterable(tree.descendants_and_empty for bundle in self for tree in bundle)
+
+    def apply_on_nodes(self, func):
+        """Call `func(node)` on each node (excluding empty nodes) in the document.
+
+        This is a cheaper alternative to running a block which only overrides `process_node()`
+        and needs no per-tree processing, e.g. `doc.apply_on_nodes(lambda node: node.misc.clear())`.
+        """
+        for node in self.nodes:
+            func(node)
 
     def draw(self, **kwargs):
         """Pretty print the trees using TextModeTrees."""
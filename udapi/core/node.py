@@ -430,6 +430,27 @@ class Node(object):
                 climber = climber._parent
         return False
 
+    def move_children_to(self, new_parent):
+        """Re-attach all children of the current node to `new_parent`.
+
+        This is equivalent to `for child in node.children: child.parent = new_parent`,
+        but the list of children of `new_parent` is updated (and sorted) just once.
+        """
+        if not self._children or new_parent is self:
+            return
+        if new_parent.is_empty():
+            raise ValueError(f'Cannot set EmptyNode as parent in basic dependencies: {new_parent}')
+        if new_parent._root is not self._root:
+            raise ValueError('Cannot move nodes between trees with move_children_to, '
+                             'use new_root.steal_nodes(nodes_to_be_moved) instead')
+        if new_parent.is_descendant_of(self):
+            raise CycleError('Moving the children of %s to %s would lead to a cycle.', self, new_parent)
+        for child in self._children:
+            child._parent = new_parent
+        new_parent._children.extend(self._children)
+        new_parent._children.sort()
+        self._children.clear()
+
     def create_child(self, **kwargs):
         """Create and return a new child of the current node."""
         new_node = Node(root=self._root, **kwargs)
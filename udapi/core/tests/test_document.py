@@ -19,5 +19,24 @@ class TestDocument(unittest.TestCase):
         tree1 = bundle1.create_tree()
         self.assertEqual(tree1.address(), "1")
 
+    def test_nodes(self):
+        doc = Document()
+        self.assertEqual(list(doc.nodes), [])
+        for forms in (["a", "b"], [], ["c"]):
+            tree = doc.create_bundle().create_tree()
+            for form in forms:
+                node = tree.create_child(form=form)
+        node.create_empty_child(deprel="dep")
+        self.assertEqual([n.form for n in doc.nodes], ["a", "b", "c"])
+        self.assertEqual(len(list(doc.nodes_and_empty)), 4)
+
+    def test_apply_on_nodes(self):
+        doc = Document()
+        tree = doc.create_bundle().create_tree()
+        for form in ("a", "b"):
+            tree.create_child(form=form)
+        doc.apply_on_nodes(lambda node: setattr(node, "lemma", node.form.upper()))
+        self.assertEqual([n.lemma for n in doc.nodes], ["A", "B"])
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+
+import itertools
+import re
+import unittest
+from udapi.block.ud.cs.fixedeprels import compile_substitutions, fix_early_edeprel, fix_clausal_edeprel, fix_nominal_edeprel
+
+RELATIONS = ('acl', 'advcl', 'nmod', 'obl', 'obl:arg')
+CASES = ('', ':nom', ':gen', ':dat', ':acc', ':voc', ':loc', ':ins')
+
+
+def apply_sequentially(rules, string):
+    """The original implementation: call re.sub() with each rule in turn."""
+    for pattern, replacement in rules:
+        string = re.sub(pattern, replacement, string)
+    return string
+
+
+def candidate_edeprels(rules):
+    """Generate edeprels from the words which occur in the patterns of the rules."""
+    words = sorted({w for pattern, _ in rules for w in re.findall(r'[^\W\d_]+', pattern)} | {'x'})
+    for relation, word, case in itertools.product(RELATIONS, words, CASES):
+        yield relation + ':' + word + case
+    for relation, word1, word2, case in itertools.product(RELATIONS, words, words, ('', ':gen', ':ins')):
+        yield relation + ':' + word1 + '_' + word2 + case
+
+
+class TestFixEdeprels(unittest.TestCase):
+
+    def test_tables_match_sequential_substitution(self):
+        for table in (fix_early_edeprel, fix_clausal_edeprel, fix_nominal_edeprel):
+            for edeprel in candidate_edeprels(table.rules):
+                self.assertEqual(table(edeprel), apply_sequentially(table.rules, edeprel), edeprel)
+
+    def test_constant_replacement_matching_later_rule(self):
+        with self.assertRaises(ValueError):
+            compile_substitutions([(r'^nmod:a$', 'nmod:b'), (r'^nmod:b$', 'nmod')])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,7 +7,7 @@ import sys
 import unittest
 
 from udapi.core.root import Root
-from udapi.core.node import Node, find_minimal_common_treelet
+from udapi.core.node import Node, CycleError, find_minimal_common_treelet
 from udapi.core.document import Document
 from udapi.block.read.conllu import Conllu
 
@@ -214,6 +214,28 @@ class TestDocument(unittest.TestCase):
 
         self.assertEqual(nodes[0].raw_deps, '2:test')
 
+    def test_move_children_to(self):
+        """Test re-attaching all children of a node at once."""
+        root = Root()
+        for i in range(5):
+            root.create_child(form=f'node{i+1}')
+
+        n1, n2, n3, n4, n5 = root.descendants()
+        n1.parent = n3
+        n5.parent = n3
+        n2.parent = n4
+        n3.move_children_to(n4)
+        self.assertEqual(n3.children, [])
+        self.assertEqual(n4.children, [n1, n2, n5])
+        self.assertEqual(n1.parent, n4)
+        self.assertEqual(n5.parent, n4)
+        # Moving the children to a leaf or to the node itself is a no-op.
+        n3.move_children_to(n4)
+        n4.move_children_to(n4)
+        self.assertEqual(n4.children, [n1, n2, n5])
+        with self.assertRaises(CycleError):
+            n4.move_children_to(n5)
+
     def test_empty_nodes(self):
         """Test creation of empty nodes and how their ord is changed when removing nodes."""
         root = Root()